@@ -0,0 +1,263 @@
+import itertools
+import zipfile
+
+import numpy as np
+from flask import Response, abort, request, stream_with_context
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional; sem ele o formato colunar é .npz
+    pa = None
+    pq = None
+
+# Linhas por bloco enviado ao cliente
+CHUNK_ROWS = 65536
+
+MIMETYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+    "npz": "application/octet-stream",
+}
+
+
+def available_formats():
+    if pa is None:
+        return ["csv", "npz"]
+    return ["csv", "arrow", "parquet", "npz"]
+
+
+def default_columnar_format():
+    return "arrow" if pa is not None else "npz"
+
+
+# -------------------------------
+# Destino de escrita incremental
+# -------------------------------
+class _ChunkSink:
+    """
+    Ficheiro apenas de escrita que acumula bytes até serem drenados.
+    Não é "seekable", pelo que zipfile/pyarrow escrevem em modo streaming.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+# -------------------------------
+# Seleção (colunas e intervalo de tempo)
+# -------------------------------
+def select_history(df, columns=None, t_min=None, t_max=None, realities=None):
+    """
+    Resolve a seleção de colunas e filtros sem copiar dados: devolve
+    (columns, mask), aplicados depois bloco a bloco na serialização.
+    `mask` é None quando todas as linhas são selecionadas.
+    """
+    if columns:
+        unknown = [col for col in columns if col not in df.columns]
+        if unknown:
+            raise KeyError(", ".join(unknown))
+    else:
+        columns = list(df.columns)
+
+    mask = np.ones(len(df), dtype=bool)
+    if t_min is not None:
+        mask &= df["t"].to_numpy() >= t_min
+    if t_max is not None:
+        mask &= df["t"].to_numpy() <= t_max
+    if realities and "reality_id" in df.columns:
+        mask &= df["reality_id"].isin(realities).to_numpy()
+
+    if mask.all():
+        mask = None
+    return columns, mask
+
+
+def _row_chunks(df, columns, mask, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if mask is not None:
+            chunk_mask = mask[start:start + chunk_rows]
+            if not chunk_mask.any():
+                continue
+            chunk = chunk.loc[chunk_mask, columns]
+        else:
+            chunk = chunk[columns]
+        yield chunk
+
+
+def _arrow_schema(df, columns, chunks):
+    # O esquema é inferido do primeiro bloco não vazio (colunas de texto
+    # vazias seriam inferidas como nulas)
+    first = next(chunks, None)
+    sample = first if first is not None else df.iloc[:0][columns]
+    return pa.Schema.from_pandas(sample, preserve_index=False), first
+
+
+# -------------------------------
+# Serializadores em streaming
+# -------------------------------
+def stream_csv(df, columns, mask=None, chunk_rows=CHUNK_ROWS):
+    yield df.iloc[:0][columns].to_csv(index=False).encode("utf-8")
+    for chunk in _row_chunks(df, columns, mask, chunk_rows):
+        yield chunk.to_csv(index=False, header=False).encode("utf-8")
+
+
+def stream_arrow(df, columns, mask=None, chunk_rows=CHUNK_ROWS):
+    sink = _ChunkSink()
+    chunks = _row_chunks(df, columns, mask, chunk_rows)
+    schema, first = _arrow_schema(df, columns, chunks)
+    with pa.ipc.new_stream(sink, schema) as writer:
+        if first is not None:
+            for chunk in itertools.chain([first], chunks):
+                writer.write_batch(
+                    pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+                )
+                yield sink.drain()
+    yield sink.drain()
+
+
+def stream_parquet(df, columns, mask=None, chunk_rows=CHUNK_ROWS):
+    sink = _ChunkSink()
+    chunks = _row_chunks(df, columns, mask, chunk_rows)
+    schema, first = _arrow_schema(df, columns, chunks)
+    with pq.ParquetWriter(sink, schema) as writer:
+        if first is not None:
+            for chunk in itertools.chain([first], chunks):
+                writer.write_table(
+                    pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                )
+                yield sink.drain()
+    yield sink.drain()
+
+
+def _npz_dtype(series):
+    if series.dtype == object or str(series.dtype) in ("str", "string"):
+        # Largura a partir dos valores distintos (poucos, p.ex. reality_id)
+        width = max((len(str(value)) for value in series.unique()), default=1)
+        return np.dtype(f"<U{max(width, 1)}")
+    return series.to_numpy()[:0].dtype
+
+
+def stream_npz(df, columns, mask=None, chunk_rows=CHUNK_ROWS):
+    """
+    Escreve um .npz (zip de .npy, um por coluna) bloco a bloco:
+    o cabeçalho .npy é escrito primeiro e os dados seguem por fatias.
+    """
+    n_rows = len(df) if mask is None else int(np.count_nonzero(mask))
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for col in columns:
+            series = df[col]
+            dtype = _npz_dtype(series)
+            header = {
+                "descr": np.lib.format.dtype_to_descr(dtype),
+                "fortran_order": False,
+                "shape": (n_rows,),
+            }
+            with archive.open(f"{col}.npy", mode="w", force_zip64=True) as member:
+                np.lib.format.write_array_header_2_0(member, header)
+                for start in range(0, len(series), chunk_rows):
+                    values = series.iloc[start:start + chunk_rows].to_numpy()
+                    if mask is not None:
+                        values = values[mask[start:start + chunk_rows]]
+                    if values.size == 0:
+                        continue
+                    member.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "arrow": stream_arrow,
+    "parquet": stream_parquet,
+    "npz": stream_npz,
+}
+
+
+# -------------------------------
+# Rotas HTTP
+# -------------------------------
+def _parse_list(value):
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_int(name):
+    value = request.args.get(name)
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, description=f"Parâmetro '{name}' deve ser inteiro.")
+
+
+def register_export_routes(server, sources):
+    """
+    Regista a rota /export/<dataset>[.<fmt>] no servidor Flask do Dash.
+    `sources` mapeia o nome do dataset para uma função que devolve o
+    DataFrame atual (ou None se ainda não existir).
+
+    Parâmetros de query: columns=a,b  t_min=  t_max=  realities=Realidade 1,...
+    """
+
+    def export(name):
+        dataset, _, fmt = name.partition(".")
+        if dataset not in sources:
+            abort(404, description=f"Dataset desconhecido: {dataset}")
+        fmt = fmt or default_columnar_format()
+        if fmt not in available_formats():
+            abort(400, description=f"Formato indisponível: {fmt}")
+
+        df = sources[dataset]()
+        if df is None:
+            abort(404, description=f"Ainda não há dados para '{dataset}'.")
+
+        try:
+            columns, mask = select_history(
+                df,
+                columns=_parse_list(request.args.get("columns")),
+                t_min=_parse_int("t_min"),
+                t_max=_parse_int("t_max"),
+                realities=_parse_list(request.args.get("realities")),
+            )
+        except KeyError as exc:
+            abort(400, description=f"Colunas desconhecidas: {exc.args[0]}")
+
+        response = Response(
+            stream_with_context(STREAMERS[fmt](df, columns, mask)),
+            mimetype=MIMETYPES[fmt],
+        )
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="{dataset}.{fmt}"'
+        )
+        return response
+
+    server.add_url_rule("/export/<name>", "export", export)
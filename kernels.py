@@ -0,0 +1,160 @@
+import os
+import warnings
+
+import numpy as np
+from scipy.special import softmax
+
+try:
+    import numba
+except ImportError:  # numba é opcional; sem ele usa-se o kernel NumPy
+    numba = None
+
+
+# =============================================================================
+# KERNELS DO PASSO TEMPORAL
+# =============================================================================
+# Cada kernel recebe os sorteios já feitos pelo modelo (um uniforme por agente
+# para a mobilidade e um por agente que muda, por ordem de agente, para a
+# escolha) e atualiza `ideology` in-place. Assim todos os backends consomem o
+# mesmo fluxo aleatório e dão o mesmo resultado para a mesma seed.
+
+
+def utilities(income, ideology, targets, S, U, C):
+    """
+    Utilidade percebida de cada agente para cada ideologia alvo,
+    com forma (len(income), len(targets)). Referência para todos os kernels.
+    """
+    r = np.asarray(income)[:, None]
+    current = np.asarray(ideology)[:, None]
+    target = np.asarray(targets)[None, :]
+
+    # Benefício material
+    material = np.where(
+        target < -0.5,
+        2.0 * (1 - r),
+        np.where(target > 0.5, 1.6 * r, 0.6),
+    )
+    # Inércia ideológica
+    inertia = -np.abs(target - current)
+    # Efeito da satisfação (centro como atrator)
+    satisfaction = S * (1 - np.abs(target))
+    # Desemprego e crescimento
+    macro = -0.5 * U * np.abs(target) + 0.4 * C * target
+
+    return material + inertia + satisfaction + macro
+
+
+class NumpyKernel:
+    """Implementação de referência, vetorizada sobre os agentes que mudam."""
+
+    name = "numpy"
+
+    def update_ideology(self, ideology, income, bins, u_move, u_choice, M, S, U, C):
+        movers = np.flatnonzero(u_move < M)
+        if movers.size == 0:
+            return
+
+        probs = softmax(
+            utilities(income[movers], ideology[movers], bins, S, U, C), axis=1
+        )
+
+        # Mesmo critério de Generator.choice: cdf normalizada + searchsorted(right)
+        cdf = np.cumsum(probs, axis=1)
+        cdf /= cdf[:, -1:]
+        choice = np.minimum((cdf <= u_choice[:, None]).sum(axis=1), bins.size - 1)
+        ideology[movers] = bins[choice]
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _numba_update_ideology(ideology, income, bins, u_move, u_choice, M, S, U, C):
+        # Versão compilada de utilities() + NumpyKernel (manter em sincronia)
+        n_bins = bins.shape[0]
+        values = np.empty(n_bins)
+        k = 0
+        for i in range(ideology.shape[0]):
+            if u_move[i] >= M:
+                continue
+
+            r = income[i]
+            current = ideology[i]
+            best = -np.inf
+            for j in range(n_bins):
+                target = bins[j]
+                if target < -0.5:
+                    material = 2.0 * (1 - r)
+                elif target > 0.5:
+                    material = 1.6 * r
+                else:
+                    material = 0.6
+                inertia = -abs(target - current)
+                satisfaction = S * (1 - abs(target))
+                macro = -0.5 * U * abs(target) + 0.4 * C * target
+                values[j] = material + inertia + satisfaction + macro
+                if values[j] > best:
+                    best = values[j]
+
+            total = 0.0
+            for j in range(n_bins):
+                values[j] = np.exp(values[j] - best)
+                total += values[j]
+
+            # cdf acumulada sobre as probabilidades, como no kernel NumPy
+            cumulative = 0.0
+            for j in range(n_bins):
+                cumulative += values[j] / total
+                values[j] = cumulative
+
+            u = u_choice[k]
+            choice = n_bins - 1
+            for j in range(n_bins):
+                if values[j] / cumulative > u:
+                    choice = j
+                    break
+            ideology[i] = bins[choice]
+            k += 1
+
+
+class NumbaKernel:
+    """Kernel compilado com Numba (cache em disco, ver NUMBA_CACHE_DIR)."""
+
+    name = "numba"
+
+    def update_ideology(self, ideology, income, bins, u_move, u_choice, M, S, U, C):
+        _numba_update_ideology(
+            ideology, income, bins, u_move, u_choice,
+            float(M), float(S), float(U), float(C),
+        )
+
+
+# -------------------------------
+# Seleção do backend
+# -------------------------------
+BACKENDS = {"numpy": NumpyKernel}
+if numba is not None:
+    BACKENDS["numba"] = NumbaKernel
+
+# Ordem de preferência para "auto"
+PREFERRED = ["numba", "numpy"]
+
+
+def available_backends():
+    return [name for name in PREFERRED if name in BACKENDS]
+
+
+def get_kernel(name=None):
+    """
+    Devolve uma instância do kernel pedido. Sem nome usa a variável de ambiente
+    IDEOLOGY_SIM_BACKEND ou "auto" (o mais rápido disponível). Um backend
+    indisponível cai para o kernel NumPy com um aviso.
+    """
+    name = name or os.environ.get("IDEOLOGY_SIM_BACKEND", "auto")
+    if name == "auto":
+        name = available_backends()[0]
+    if name not in BACKENDS:
+        warnings.warn(
+            f"Backend '{name}' indisponível; a usar 'numpy'.", RuntimeWarning
+        )
+        name = "numpy"
+    return BACKENDS[name]()
@@ -3,9 +3,12 @@ import numpy as np
 import pandas as pd
 from dash import Dash, dcc, html, Input, Output, State
 import plotly.express as px
+import plotly.graph_objects as go
 
 # Importa o modelo original
 from model import SocietyModel
+from export import default_columnar_format, register_export_routes
+import surrogate
 
 # =============================================================================
 # FUNÇÃO DE SIMULAÇÃO EM LOTE ("A Mente da IA")
@@ -61,6 +64,12 @@ def build_home_data(steps=120, seed=42, agents=5000):
 
 HOME_DF, HOME_IDEOLOGY_OPTIONS, HOME_MACRO_OPTIONS = build_home_data()
 
+# Índice da superfície de resposta (None se ainda não foi construído)
+SURROGATE_INDEX = surrogate.load_default_index()
+
+# Último resultado da Calculadora de Multiverso (servido em /export/multiverse)
+MULTIVERSE_DF = None
+
 IDELOGY_WEIGHT_RULES = {
     "Desigualdade": {
         "neutral": 0.5,
@@ -157,6 +166,18 @@ def get_home_layout():
             className="link-button",
             style={"marginLeft": "12px"},
         ),
+        html.A(
+            "Ir para Explorador What-if (/what-if)",
+            href="/what-if",
+            className="link-button",
+            style={"marginLeft": "12px"},
+        ),
+        html.Div([
+            "Exportar histórico: ",
+            html.A("CSV", href="/export/home.csv"),
+            " · ",
+            html.A("Colunar", href=f"/export/home.{default_columnar_format()}"),
+        ], style={"marginTop": "8px"}),
         html.Hr(),
         html.Div(
             [
@@ -363,11 +384,83 @@ def get_ideology_chances_layout():
     ])
 
 
+# --- Layout do Explorador What-if (/what-if) ---
+# Limites dos controlos quando não há índice (consultas sempre ao vivo)
+WHAT_IF_PARAMS = {
+    "S_crit": ("input-s-crit", "S_crit (satisfação crítica)", 0.3, 1.0, 0.7),
+    "sigma": ("input-sigma", "sigma (largura da transição)", 0.02, 0.3, 0.08),
+    "m0": ("input-m0", "m0 (mobilidade base)", 0.05, 0.8, 0.35),
+}
+
+
+def what_if_slider(name):
+    slider_id, label, low, high, value = WHAT_IF_PARAMS[name]
+    if SURROGATE_INDEX is not None:
+        # Com índice, os controlos ficam dentro da região amostrada
+        low, high = (float(bound) for bound in SURROGATE_INDEX.bounds()[name])
+    value = min(max(value, low), high)
+
+    return html.Div(
+        [
+            html.Label(label),
+            dcc.Slider(
+                id=slider_id,
+                min=low,
+                max=high,
+                step=0.01,
+                value=value,
+                marks={low: f"{low:g}", value: f"{value:g}", high: f"{high:g}"},
+            ),
+        ],
+        style={"flex": "1", "minWidth": "240px"},
+    )
+
+
+def get_what_if_layout():
+    if SURROGATE_INDEX is None:
+        index_info = (
+            "Índice não encontrado: todas as consultas correm o modelo ao vivo. "
+            "Construa-o com `python surrogate.py`."
+        )
+    else:
+        index_info = (
+            "Os controlos cobrem a região amostrada do índice; "
+            "as respostas são interpoladas."
+        )
+
+    return html.Div([
+        html.H2("🔮 Explorador What-if"),
+        html.P(
+            "Ajuste os parâmetros do modelo e veja os resultados de longo prazo "
+            "interpolados a partir de simulações pré-calculadas."
+        ),
+        html.Div(index_info, style={"color": "gray", "marginBottom": "10px"}),
+        html.Div(
+            [what_if_slider(name) for name in WHAT_IF_PARAMS],
+            style={"display": "flex", "gap": "16px", "flexWrap": "wrap"},
+        ),
+        dcc.Loading(
+            id="loading-what-if",
+            children=[
+                html.Div(id="what-if-status", style={"color": "gray", "marginTop": "10px"}),
+                dcc.Graph(id="what-if-equilibrium"),
+                dcc.Graph(id="what-if-trajectory"),
+            ],
+        ),
+    ])
+
+
 # =============================================================================
 # APP DASH & ROUTING
 # =============================================================================
 app = Dash(__name__, suppress_callback_exceptions=True)
 
+# Rotas de exportação em streaming (/export/home, /export/multiverse)
+register_export_routes(app.server, {
+    "home": lambda: HOME_DF,
+    "multiverse": lambda: MULTIVERSE_DF,
+})
+
 # Layout Mestre com Roteamento
 app.layout = html.Div([
     dcc.Location(id='url', refresh=False),
@@ -381,6 +474,8 @@ def display_page(pathname):
         return get_calc_reality_layout()
     if pathname == '/ideology-chances':
         return get_ideology_chances_layout()
+    if pathname == '/what-if':
+        return get_what_if_layout()
     else:
         # Por padrão mostra uma versão simplificada ou o app original
         # Aqui, apenas para exemplo, mostramos um link. 
@@ -397,6 +492,7 @@ def display_page(pathname):
     prevent_initial_call=True
 )
 def update_multiverse_graphs(n_clicks, n_realities, steps, agents):
+    global MULTIVERSE_DF
     if not n_clicks:
         return html.Div()
     if n_realities is None or steps is None or agents is None:
@@ -413,6 +509,7 @@ def update_multiverse_graphs(n_clicks, n_realities, steps, agents):
         agents=agents, 
         base_seed=42
     )
+    MULTIVERSE_DF = df
     
     elapsed = time.time() - start_time
     
@@ -444,6 +541,12 @@ def update_multiverse_graphs(n_clicks, n_realities, steps, agents):
     return html.Div([
         html.Div(f"Simulação concluída em {elapsed:.2f} segundos. {len(df)} pontos de dados gerados.", 
                  style={"color": "gray", "marginBottom": "10px"}),
+        html.Div([
+            "Exportar resultados: ",
+            html.A("CSV", href="/export/multiverse.csv"),
+            " · ",
+            html.A("Colunar", href=f"/export/multiverse.{default_columnar_format()}"),
+        ], style={"marginBottom": "10px"}),
         
         dcc.Graph(figure=fig_polar),
         html.Div([
@@ -554,9 +657,83 @@ def update_ideology_chances(inequality, unemployment, growth, satisfaction, pola
 
     return impact_fig, chance_fig
 
+
+@app.callback(
+    Output("what-if-status", "children"),
+    Output("what-if-equilibrium", "figure"),
+    Output("what-if-trajectory", "figure"),
+    Input("input-s-crit", "value"),
+    Input("input-sigma", "value"),
+    Input("input-m0", "value"),
+)
+def update_what_if(s_crit, sigma, m0):
+    # Arredonda o passo do slider (evita 0.8000000001 fora da grelha)
+    params = {
+        name: round(value, 6)
+        for name, value in zip(WHAT_IF_PARAMS, (s_crit, sigma, m0))
+    }
+
+    start_time = time.time()
+    result = surrogate.query(params, index=SURROGATE_INDEX)
+    elapsed = time.time() - start_time
+
+    metrics = result["metrics"]
+    eq = result["equilibrium"]
+    snaps = result["snapshots"]
+
+    # Gráfico A: quotas ideológicas de equilíbrio com banda de incerteza
+    shares = [metrics.index(label) for label in HOME_IDEOLOGY_OPTIONS]
+    eq_fig = go.Figure(go.Bar(
+        x=HOME_IDEOLOGY_OPTIONS,
+        y=eq["mean"][shares],
+        error_y=dict(
+            type="data",
+            symmetric=False,
+            array=eq["high"][shares] - eq["mean"][shares],
+            arrayminus=eq["mean"][shares] - eq["low"][shares],
+        ),
+    ))
+    eq_fig.update_layout(
+        title="Distribuição ideológica de equilíbrio",
+        xaxis_title="Ideologia",
+        yaxis_title="Proporção",
+        yaxis_tickformat=".0%",
+    )
+
+    # Gráfico B: trajetória de Polarização, Satisfação e Gini nos t amostrados
+    traj_fig = go.Figure()
+    for name in ["Polarização", "Satisfação", "Gini"]:
+        k = metrics.index(name)
+        traj_fig.add_trace(go.Scatter(
+            x=result["times"],
+            y=snaps["mean"][:, k],
+            name=name,
+            mode="lines+markers",
+            error_y=dict(
+                type="data",
+                symmetric=False,
+                array=snaps["high"][:, k] - snaps["mean"][:, k],
+                arrayminus=snaps["mean"][:, k] - snaps["low"][:, k],
+            ),
+        ))
+    traj_fig.update_layout(
+        title="Variáveis macrossociais ao longo do tempo",
+        xaxis_title="Tempo",
+        yaxis_title="Valor",
+        hovermode="x unified",
+    )
+
+    source = "índice interpolado" if result["source"] == "index" else "simulação ao vivo"
+    status = (
+        f"Resposta via {source} em {elapsed * 1000:.0f} ms. "
+        f"Barras de erro: média ± {surrogate.BAND_Z} desvios-padrão entre seeds."
+    )
+    return status, eq_fig, traj_fig
+
 if __name__ == "__main__":
     # Roda o servidor
     print("Servidor rodando...")
     print("Acesse a Home em: http://127.0.0.1:8050/")
     print("Acesse a Calculadora em: http://127.0.0.1:8050/calc-reality")
+    print("Acesse o Explorador What-if em: http://127.0.0.1:8050/what-if")
     app.run(debug=True)
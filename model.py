@@ -1,9 +1,20 @@
 import numpy as np
-from scipy.special import softmax
+
+from kernels import get_kernel, utilities
 
 class SocietyModel:
-    def __init__(self, N=5000, seed=42):
+    labels = [
+        "Comunismo",
+        "Socialismo Democrático",
+        "Social-democracia",
+        "Centrismo",
+        "Conservadorismo",
+        "Libertarianismo",
+    ]
+
+    def __init__(self, N=5000, seed=42, backend=None, S_crit=0.7, sigma=0.08, m0=0.35):
         self.rng = np.random.default_rng(seed)
+        self.kernel = get_kernel(backend)
 
         self.N = N
         self.t = 0
@@ -22,19 +33,11 @@ class SocietyModel:
         self.polarization = 0.0
 
         # === PARÂMETROS ===
-        self.S_crit = 0.7
-        self.sigma = 0.08
-        self.m0 = 0.35
+        self.S_crit = S_crit
+        self.sigma = sigma
+        self.m0 = m0
 
         self.ideology_bins = np.array([-0.85, -0.55, -0.2, 0.2, 0.55, 0.85])
-        self.labels = [
-            "Comunismo",
-            "Socialismo Democrático",
-            "Social-democracia",
-            "Centrismo",
-            "Conservadorismo",
-            "Libertarianismo",
-        ]
         self.bin_edges = np.concatenate(
             ([-1.0], (self.ideology_bins[:-1] + self.ideology_bins[1:]) / 2, [1.0])
         )
@@ -49,30 +52,10 @@ class SocietyModel:
     # Utilidade percebida
     # -------------------------------
     def utility(self, i, target):
-        r = self.income[i]
-        current = self.ideology[i]
-
-        # Benefício material
-        if target < -0.5:
-            material = 2.0 * (1 - r)
-        elif target > 0.5:
-            material = 1.6 * r
-        else:
-            material = 0.6
-
-        # Inércia ideológica
-        inertia = -abs(target - current)
-
-        # Efeito da satisfação (centro como atrator)
-        satisfaction = self.S * (1 - abs(target))
-
-        # Desemprego e crescimento
-        macro = (
-            -0.5 * self.U * abs(target)
-            + 0.4 * self.C * target
-        )
-
-        return material + inertia + satisfaction + macro
+        return utilities(
+            self.income[i:i + 1], self.ideology[i:i + 1], [target],
+            self.S, self.U, self.C,
+        )[0, 0]
 
     # -------------------------------
     # Um passo temporal
@@ -80,13 +63,13 @@ class SocietyModel:
     def step(self):
         M = self.mobility()
 
-        for i in range(self.N):
-            if self.rng.random() < M:
-                utilities = np.array([
-                    self.utility(i, ide) for ide in self.ideology_bins
-                ])
-                probs = softmax(utilities)
-                self.ideology[i] = self.rng.choice(self.ideology_bins, p=probs)
+        # Sorteios feitos aqui para que todos os backends vejam o mesmo fluxo
+        u_move = self.rng.random(self.N)
+        u_choice = self.rng.random(np.count_nonzero(u_move < M))
+        self.kernel.update_ideology(
+            self.ideology, self.income, self.ideology_bins,
+            u_move, u_choice, M, self.S, self.U, self.C,
+        )
 
         self.update_macro()
         self.t += 1
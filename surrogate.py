@@ -0,0 +1,259 @@
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+
+from model import SocietyModel
+
+# =============================================================================
+# SUPERFÍCIE DE RESPOSTA PRÉ-CALCULADA
+# =============================================================================
+# O passo offline corre o modelo real numa grelha de (S_crit, sigma, m0) e
+# várias seeds e guarda resumos (quotas por ideologia, polarização, S, Gini)
+# num índice .npz. As consultas interpolam nesse índice; fora da região
+# amostrada corre-se uma simulação ao vivo.
+
+PARAMS = ["S_crit", "sigma", "m0"]
+
+DEFAULT_GRID = {
+    "S_crit": np.linspace(0.5, 0.9, 5),
+    "sigma": np.linspace(0.04, 0.16, 4),
+    "m0": np.linspace(0.15, 0.55, 5),
+}
+DEFAULT_TIMES = (10, 50, 100, 150)
+DEFAULT_STEPS = 150
+DEFAULT_AGENTS = 2000
+DEFAULT_SEEDS = 4
+
+DEFAULT_INDEX_PATH = "surrogate_index.npz"
+
+# Fração final da trajetória usada para o valor de equilíbrio
+EQUILIBRIUM_FRACTION = 0.25
+
+# Banda de incerteza: média ± Z * desvio-padrão entre seeds
+BAND_Z = 1.96
+
+
+def summary_metrics(labels):
+    return list(labels) + ["Polarização", "Satisfação", "Gini"]
+
+
+def _check_times(times, steps):
+    """Valida os tempos pedidos (1 <= t) e descarta os posteriores a `steps`."""
+    invalid = [t for t in times if t < 1]
+    if invalid:
+        raise ValueError(f"Tempos devem ser >= 1: {invalid}")
+    times = [t for t in times if t <= steps]
+    if not times:
+        raise ValueError(f"Nenhum tempo pedido está dentro de 1..{steps}.")
+    return times
+
+
+def simulate_summary(params, seed, steps=DEFAULT_STEPS, agents=DEFAULT_AGENTS,
+                     times=DEFAULT_TIMES):
+    """
+    Corre uma simulação e devolve (snapshots nos tempos pedidos, equilíbrio),
+    com forma (len(times), n_metrics) e (n_metrics,).
+    """
+    model = SocietyModel(N=agents, seed=seed, **params)
+    metrics = summary_metrics(SocietyModel.labels)
+    history = np.empty((steps, len(metrics)))
+
+    for k in range(steps):
+        model.step()
+        snap = model.snapshot()
+        history[k] = [snap[name] for name in metrics]
+
+    # model.t após k+1 passos é k+1
+    rows = [t - 1 for t in times]
+    tail = max(1, int(round(steps * EQUILIBRIUM_FRACTION)))
+    return history[rows], history[-tail:].mean(axis=0)
+
+
+# -------------------------------
+# Construção offline
+# -------------------------------
+def build_index(path=DEFAULT_INDEX_PATH, grid=None, seeds=DEFAULT_SEEDS,
+                steps=DEFAULT_STEPS, agents=DEFAULT_AGENTS, times=DEFAULT_TIMES,
+                base_seed=42, verbose=True):
+    grid = grid or DEFAULT_GRID
+    axes = [np.asarray(grid[name], dtype=float) for name in PARAMS]
+    times = _check_times(times, steps)
+    labels = SocietyModel.labels
+    metrics = summary_metrics(labels)
+
+    shape = tuple(len(axis) for axis in axes)
+    snapshots = np.empty(shape + (seeds, len(times), len(metrics)))
+    equilibrium = np.empty(shape + (seeds, len(metrics)))
+
+    start_time = time.time()
+    points = list(itertools.product(*(range(n) for n in shape)))
+    for count, idx in enumerate(points, start=1):
+        params = {name: axes[k][idx[k]] for k, name in enumerate(PARAMS)}
+        for s in range(seeds):
+            snapshots[idx + (s,)], equilibrium[idx + (s,)] = simulate_summary(
+                params, base_seed + s, steps=steps, agents=agents, times=times
+            )
+        if verbose:
+            elapsed = time.time() - start_time
+            print(f"[{count}/{len(points)}] {params} ({elapsed:.1f}s)")
+
+    np.savez(
+        path,
+        S_crit=axes[0],
+        sigma=axes[1],
+        m0=axes[2],
+        times=np.asarray(times),
+        metrics=np.asarray(metrics),
+        labels=np.asarray(labels),
+        snapshot_mean=snapshots.mean(axis=3),
+        snapshot_std=snapshots.std(axis=3),
+        equilibrium_mean=equilibrium.mean(axis=3),
+        equilibrium_std=equilibrium.std(axis=3),
+        steps=steps,
+        agents=agents,
+        seeds=seeds,
+    )
+    return path
+
+
+# -------------------------------
+# Consulta
+# -------------------------------
+def _bands(mean, std):
+    return {"mean": mean, "low": mean - BAND_Z * std, "high": mean + BAND_Z * std}
+
+
+class SurrogateIndex:
+    """Índice carregado em memória com interpoladores sobre a grelha."""
+
+    def __init__(self, data):
+        self.axes = [data[name] for name in PARAMS]
+        self.times = [int(t) for t in data["times"]]
+        self.metrics = [str(name) for name in data["metrics"]]
+        self.labels = [str(name) for name in data["labels"]]
+        self.steps = int(data["steps"])
+        self.agents = int(data["agents"])
+        self.seeds = int(data["seeds"])
+        self._interp = {
+            key: RegularGridInterpolator(self.axes, data[key])
+            for key in (
+                "snapshot_mean", "snapshot_std",
+                "equilibrium_mean", "equilibrium_std",
+            )
+        }
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        with np.load(path) as data:
+            return cls(data)
+
+    def bounds(self):
+        return {name: (axis[0], axis[-1]) for name, axis in zip(PARAMS, self.axes)}
+
+    def contains(self, params):
+        return all(
+            axis[0] <= params[name] <= axis[-1]
+            for name, axis in zip(PARAMS, self.axes)
+        )
+
+    def interpolate(self, params):
+        point = [[params[name] for name in PARAMS]]
+        values = {key: interp(point)[0] for key, interp in self._interp.items()}
+        return {
+            "source": "index",
+            "times": self.times,
+            "metrics": self.metrics,
+            "snapshots": _bands(values["snapshot_mean"], values["snapshot_std"]),
+            "equilibrium": _bands(
+                values["equilibrium_mean"], values["equilibrium_std"]
+            ),
+        }
+
+
+def run_live(params, seeds=DEFAULT_SEEDS, steps=DEFAULT_STEPS,
+             agents=DEFAULT_AGENTS, times=DEFAULT_TIMES, base_seed=42):
+    times = _check_times(times, steps)
+    runs = [
+        simulate_summary(params, base_seed + s, steps=steps, agents=agents, times=times)
+        for s in range(seeds)
+    ]
+    snapshots = np.array([run[0] for run in runs])
+    equilibrium = np.array([run[1] for run in runs])
+    return {
+        "source": "live",
+        "times": times,
+        "metrics": summary_metrics(SocietyModel.labels),
+        "snapshots": _bands(snapshots.mean(axis=0), snapshots.std(axis=0)),
+        "equilibrium": _bands(equilibrium.mean(axis=0), equilibrium.std(axis=0)),
+    }
+
+
+def query(params, index=None, **live_kwargs):
+    """
+    Responde a uma consulta what-if. Usa o índice se o ponto estiver dentro
+    da grelha amostrada; caso contrário corre o modelo ao vivo.
+    Devolve um dict com "source" ("index" ou "live"), "times", "metrics",
+    "snapshots" e "equilibrium" (cada um com "mean", "low" e "high").
+    """
+    if index is not None and index.contains(params):
+        return index.interpolate(params)
+
+    if index is not None:
+        live_kwargs = {
+            "seeds": index.seeds,
+            "steps": index.steps,
+            "agents": index.agents,
+            "times": index.times,
+            **live_kwargs,
+        }
+    return run_live(params, **live_kwargs)
+
+
+def load_default_index(path=None):
+    path = path or os.environ.get("IDEOLOGY_SIM_SURROGATE", DEFAULT_INDEX_PATH)
+    if not os.path.exists(path):
+        return None
+    return SurrogateIndex.load(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Constrói o índice da superfície de resposta (S_crit, sigma, m0)."
+    )
+    parser.add_argument("--out", default=DEFAULT_INDEX_PATH)
+    parser.add_argument("--seeds", type=int, default=DEFAULT_SEEDS)
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS)
+    parser.add_argument("--agents", type=int, default=DEFAULT_AGENTS)
+    parser.add_argument(
+        "--times", type=int, nargs="+", default=list(DEFAULT_TIMES),
+        help="Tempos t em que se guardam os resumos da trajetória.",
+    )
+    for name in PARAMS:
+        parser.add_argument(
+            f"--{name}", type=float, nargs=3,
+            metavar=("MIN", "MAX", "N"),
+            help=f"Grelha de {name} (por omissão {DEFAULT_GRID[name].tolist()}).",
+        )
+    args = parser.parse_args()
+    try:
+        _check_times(args.times, args.steps)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    grid = {
+        name: (
+            np.linspace(getattr(args, name)[0], getattr(args, name)[1],
+                        int(getattr(args, name)[2]))
+            if getattr(args, name) else DEFAULT_GRID[name]
+        )
+        for name in PARAMS
+    }
+    path = build_index(
+        args.out, grid=grid, seeds=args.seeds, steps=args.steps,
+        agents=args.agents, times=args.times,
+    )
+    print(f"Índice guardado em {path}")
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from kernels import available_backends
+from model import SocietyModel
+
+
+def run(backend, seed, steps=60, agents=3000):
+    model = SocietyModel(N=agents, seed=seed, backend=backend)
+    for _ in range(steps):
+        model.step()
+    return model
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_backends_agree(seed):
+    reference = run("numpy", seed)
+    for backend in available_backends():
+        model = run(backend, seed)
+        assert model.kernel.name == backend
+        np.testing.assert_array_equal(model.ideology, reference.ideology)
+        assert model.snapshot() == reference.snapshot()